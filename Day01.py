@@ -57,13 +57,189 @@ What is the sum of all of the calibration values?
 
 """
 
-# import numpy as np
-import re
+import numpy as np
+# import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import functools
+from itertools import repeat
+import mmap
+import os
+import random
+import tempfile
+import time
 
+digit_vocabulary = {"1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "one": 1, "two": 2,
+                    "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
+
+
+def build_automaton(vocabulary):
+    # Trie über alle Wörter aufbauen
+    goto = [dict()]
+    output = [None]
+    for word, digit in vocabulary.items():
+        state = 0
+        for char in word:
+            if char not in goto[state]:
+                goto[state][char] = len(goto)
+                goto.append(dict())
+                output.append(None)
+            state = goto[state][char]
+        output[state] = (len(word), digit)
+
+    # Aho-Corasick: Fehlerlinks per Breitensuche und direkt zu vollständigen Übergängen auflösen
+    fail = [0] * len(goto)
+    delta = [dict() for _ in goto]
+    delta[0] = dict(goto[0])
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        delta[state] = dict(delta[fail[state]])
+        delta[state].update(goto[state])
+        if output[state] is None:
+            # längster Treffer, der hier endet, ist der längste Treffer des Fehlerlinks
+            output[state] = output[fail[state]]
+        for char, next_state in goto[state].items():
+            fail[next_state] = delta[fail[state]].get(char, 0) if state else 0
+            queue.append(next_state)
+
+    max_length = max(len(word) for word in vocabulary)
+    return delta, output, max_length
+
+
+def first_match(chars, automaton):
+    delta, output, max_length = automaton
+    state = 0
+    best_start, best_digit = None, None
+    for i, char in enumerate(chars):
+        state = delta[state].get(char, 0)
+        if output[state] is not None:
+            length, digit = output[state]
+            if best_start is None or i - length + 1 < best_start:
+                best_start, best_digit = i - length + 1, digit
+        # Ein früher beginnender Treffer müsste spätestens hier enden
+        if best_start is not None and i >= best_start + max_length - 2:
+            break
+    return best_digit
+
+
+@functools.lru_cache(maxsize=None)
+def compile_vocabulary_items(items):
+    vocabulary = dict(items)
+    return (build_automaton(vocabulary),
+            build_automaton({word[::-1]: digit for word, digit in vocabulary.items()}))
+
+
+def compile_vocabulary(vocabulary):
+    # Vorwärts- und gespiegelter Automat, pro Vokabular nur einmal gebaut
+    return compile_vocabulary_items(frozenset(vocabulary.items()))
+
+
+numeral_automaton = build_automaton({str(digit): digit for digit in range(1, 10)})
+
+
+def calibration_value(line, automata):
+    forward_automaton, backward_automaton = automata
+    first_digit = first_match(line, forward_automaton)
+    # Zeilen ohne Treffer aus dem Vokabular tragen nichts bei
+    if first_digit is None:
+        return 0
+    return 10 * first_digit + first_match(reversed(line), backward_automaton)
+
+
+def calibration_values(line, automata):
+    # Wert für Teil 1 und Teil 2 in einem Durchgang über die Zeile
+    first_digit = first_match(line, numeral_automaton)
+    if first_digit is None:
+        # Zeilen ohne Ziffer tragen zu Teil 1 nichts bei, wie in part1_bulk
+        value1 = 0
+    else:
+        value1 = 10 * first_digit + first_match(reversed(line), numeral_automaton)
+    return value1, calibration_value(line, automata)
+
+
+def calibrate_chunk(path, start, end, vocabulary=digit_vocabulary):
+    # Jeder Worker mappt die Datei selbst und liest nur seinen eigenen Abschnitt
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        chunk = buffer[start:end].decode()
+    automata = compile_vocabulary(vocabulary)
+    sum_part1, sum_part2 = 0, 0
+    for line in chunk.splitlines():
+        if line:
+            value1, value2 = calibration_values(line, automata)
+            sum_part1 += value1
+            sum_part2 += value2
+    return sum_part1, sum_part2
+
+
+def calibrate_parallel(path='inputs/input_day1', workers=None, vocabulary=digit_vocabulary):
+    workers = workers or os.cpu_count()
+    if os.path.getsize(path) == 0:
+        return 0, 0
 
-def part1():
+    # Abschnittsgrenzen auf Zeilenumbrüche ausrichten, mehrere Abschnitte pro Worker für Lastausgleich
+    number_of_chunks = 4 * workers
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        size = len(buffer)
+        bounds = [0]
+        for i in range(1, number_of_chunks):
+            position = buffer.find(b'\n', max(size * i // number_of_chunks, bounds[-1]))
+            if position == -1:
+                break
+            bounds.append(position + 1)
+        bounds.append(size)
+
+    sum_part1, sum_part2 = 0, 0
+    with ProcessPoolExecutor(workers) as executor:
+        for value1, value2 in executor.map(calibrate_chunk, repeat(path), bounds[:-1], bounds[1:],
+                                             repeat(vocabulary)):
+            sum_part1 += value1
+            sum_part2 += value2
+    return sum_part1, sum_part2
+
+
+class CalibrationAccumulator:
+    # Laufende Summen für beide Teile über beliebig zerstückelte Byte-Blöcke (z.B. stdin oder Socket)
+    def __init__(self, vocabulary=digit_vocabulary):
+        self.automata = compile_vocabulary(vocabulary)
+        self.remainder = bytearray()
+        self.part1 = 0
+        self.part2 = 0
+
+    def feed(self, chunk):
+        end = chunk.rfind(b'\n')
+        if end == -1:
+            self.remainder += chunk
+            return
+        # Nur die über Blockgrenzen angefangene Zeile wird zwischengespeichert
+        self.remainder += chunk[:end]
+        for line in self.remainder.split(b'\n'):
+            self.add_line(line)
+        self.remainder = bytearray(chunk[end + 1:])
+
+    def add_line(self, line):
+        line = line.decode().rstrip('\r')
+        if line:
+            value1, value2 = calibration_values(line, self.automata)
+            self.part1 += value1
+            self.part2 += value2
+
+    def close(self):
+        self.add_line(self.remainder)
+        self.remainder = bytearray()
+        return self.part1, self.part2
+
+
+def calibrate_stream(stream, chunk_size=1 << 16, vocabulary=digit_vocabulary):
+    accumulator = CalibrationAccumulator(vocabulary)
+    while chunk := stream.read(chunk_size):
+        accumulator.feed(chunk)
+    return accumulator.close()
+
+
+def part1(path='inputs/input_day1'):
     sum_calibration_values = 0
-    with open('inputs/input_day1', 'r') as file:
+    with open(path, 'r') as file:
         for line in file:
             flag = True
             i = 0
@@ -82,18 +258,80 @@ def part1():
     return sum_calibration_values
 
 
-def part2():
+def part1_bulk(path='inputs/input_day1'):
+    with open(path, 'rb') as file:
+        buffer = np.frombuffer(file.read(), dtype=np.uint8)
+    if buffer.size and buffer[-1] != 10:
+        buffer = np.append(buffer, np.uint8(10))
+    if not buffer.size:
+        return 0
+
+    # Jede Zeile reicht von ihrem Anfang bis einschließlich ihres Zeilenumbruchs
+    newlines = np.flatnonzero(buffer == 10)
+    line_starts = np.concatenate(([0], newlines[:-1] + 1))
+    is_digit = (buffer >= 48) & (buffer <= 57)
+    positions = np.arange(buffer.size)
+    first = np.minimum.reduceat(np.where(is_digit, positions, buffer.size), line_starts)
+    last = np.maximum.reduceat(np.where(is_digit, positions, -1), line_starts)
+
+    # Zeilen ohne Ziffer tragen nichts bei
+    valid = last >= 0
+    first_digits = buffer[first[valid]].astype(np.int64) - 48
+    last_digits = buffer[last[valid]].astype(np.int64) - 48
+    return int(10 * first_digits.sum() + last_digits.sum())
+
+
+def benchmark_part1(number_of_lines=1_000_000):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    with tempfile.NamedTemporaryFile('w', suffix='_day1', delete=False) as file:
+        for _ in range(number_of_lines):
+            line = ''.join(random.choices(letters + '123456789', k=random.randint(5, 40)))
+            file.write(random.choice(letters) + line + random.choice('123456789') + '\n')
+        path = file.name
+
+    start = time.perf_counter()
+    loop_result = part1(path)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    bulk_result = part1_bulk(path)
+    bulk_time = time.perf_counter() - start
+    os.remove(path)
+    assert loop_result == bulk_result
+    print(f"{number_of_lines} lines: loop {loop_time:.3f}s, bulk {bulk_time:.3f}s ({loop_time / bulk_time:.1f}x)")
+
+
+def part2(path='inputs/input_day1', vocabulary=digit_vocabulary):
+    automata = compile_vocabulary(vocabulary)
     sum_calibration_values = 0
-    matching_pattern = re.compile("(?=([1-9]|one|two|three|four|five|six|seven|eight|nine))")
-    mapping_dict = {"1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "one": 1, "two": 2,
-                    "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
-    with open('inputs/input_day1', 'r') as file:
+    with open(path, 'r') as file:
         for line in file:
-            matching_list = re.findall(matching_pattern, line)
-            sum_calibration_values += 10 * mapping_dict[matching_list[0]] + mapping_dict[matching_list[-1]]
-            # print(10 * mapping_dict[matching_list[0]] + mapping_dict[matching_list[-1]])
+            # vorwärts bis zum ersten Treffer, rückwärts (gespiegelter Automat) bis zum letzten Treffer
+            sum_calibration_values += calibration_value(line, automata)
     return sum_calibration_values
 
 
+def benchmark_vocabularies(sizes=(10, 100, 1000), number_of_lines=100_000):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    for size in sizes:
+        vocabulary = dict()
+        while len(vocabulary) < size:
+            vocabulary[''.join(random.choices(letters, k=random.randint(3, 8)))] = random.randint(1, 9)
+        words = list(vocabulary)
+        with tempfile.NamedTemporaryFile('w', suffix='_day1', delete=False) as file:
+            for _ in range(number_of_lines):
+                line = ''.join(random.choices(letters, k=random.randint(5, 40)))
+                file.write(random.choice(words) + line + random.choice(words) + '\n')
+            path = file.name
+
+        start = time.perf_counter()
+        compile_vocabulary(vocabulary)
+        compile_time = time.perf_counter() - start
+        start = time.perf_counter()
+        part2(path, vocabulary)
+        scan_time = time.perf_counter() - start
+        os.remove(path)
+        print(f"{size} words: compile {compile_time:.3f}s, {number_of_lines} lines {scan_time:.3f}s")
+
+
 if __name__ == "__main__":
     print(part2())
@@ -75,63 +75,144 @@ For each game, find the minimum set of cubes that must have been present. What i
 
 """
 
-# import numpy as np
-# import re
-
-
-def convert_input():
-    games = []
-    with open('inputs/input_day2', 'r') as file:
-        for line in file:
-            line = line.split(': ')[1][:-1]
-            sets = line.split('; ')
-            game = []
-            for turn in sets:
-                b, g, r = 0, 0, 0
-                turn = turn.split(', ')
-                for color in turn:
-                    color = color.split(' ')
-                    if "blue" == color[1]:
-                        b = int(color[0])
-                    elif "green" == color[1]:
-                        g = int(color[0])
-                    elif "red" == color[1]:
-                        r = int(color[0])
-                game.append((r, g, b))
-            games.append(game)
-    return games
+import numpy as np
+import re
+
+# Spalte (r, g, b) nach Anfangsbuchstabe der Farbe
+color_columns = np.full(256, -1, dtype=np.int64)
+color_columns[[ord('r'), ord('g'), ord('b')]] = [0, 1, 2]
+
+
+def convert_input(path='inputs/input_day2'):
+    # Spaltenformat: ein (Züge, 3)-int32-Array mit (r, g, b) und der Start-Index jedes Spiels
+    with open(path, 'rb') as file:
+        buffer = file.read().rstrip()
+    if not buffer:
+        return np.zeros((0, 3), dtype=np.int32), np.zeros(0, dtype=np.int64)
+    buffer = np.frombuffer(buffer + b'\n', dtype=np.uint8)
+
+    # Zahlenwerte aller Ziffernfolgen auf einmal bestimmen
+    is_digit = (buffer >= 48) & (buffer <= 57)
+    digit_positions = np.flatnonzero(is_digit)
+    run_starts = np.flatnonzero(np.diff(digit_positions, prepend=-2) != 1)
+    run_lengths = np.diff(run_starts, append=len(digit_positions))
+    run_ends = digit_positions[run_starts + run_lengths - 1]
+    powers = 10 ** (np.repeat(run_ends, run_lengths) - digit_positions)
+    values = np.add.reduceat((buffer[digit_positions] - 48).astype(np.int64) * powers, run_starts)
+
+    # Farbangaben sind "<Zahl> <r|g|b>", "Game 12:" fällt wegen des Doppelpunkts heraus
+    count_ends = np.flatnonzero(is_digit[:-2] & (buffer[1:-1] == 32) & (color_columns[buffer[2:]] >= 0))
+    counts = values[np.searchsorted(run_ends, count_ends)]
+    columns = color_columns[buffer[count_ends + 2]]
+
+    # Jedes ';' und jeder Zeilenumbruch schließt einen Zug ab
+    separators = np.cumsum((buffer == 59) | (buffer == 10))
+    newlines = np.flatnonzero(buffer == 10)
+    draws = np.zeros((separators[-1], 3), dtype=np.int32)
+    draws[separators[count_ends], columns] = counts
+    offsets = np.concatenate(([0], separators[newlines[:-1]])).astype(np.int64)
+    return draws, offsets
+
+
+def maxima_per_game(draws, offsets):
+    return np.maximum.reduceat(draws, offsets, axis=0)
+
+
+def build_limit_index(maxima):
+    # Statischer Bereichsbaum über die nach r sortierten (r, g, b)-Maxima, gleiche Tripel werden vorher
+    # zusammengefasst (Gewicht = Summe ihrer IDs). Ebene L: innerhalb jedes Blocks der Größe 2^L nach g sortiert,
+    # darunter Ebene (L, M): innerhalb jedes Blocks der Größe 2^M nach b sortiert, mit Präfixsummen der Gewichte.
+    # Speicher O(U log² U) für U verschiedene Tripel, wird einmal gebaut und danach nur noch gelesen.
+    maxima = np.asarray(maxima, dtype=np.int64).reshape(-1, 3)
+    triples, inverse = np.unique(maxima, axis=0, return_inverse=True)
+    weights = np.zeros(len(triples), dtype=np.int64)
+    np.add.at(weights, inverse.ravel(), np.arange(1, len(maxima) + 1))
+
+    g_values, b_values = np.unique(triples[:, 1]), np.unique(triples[:, 2])
+    g_ranks = np.searchsorted(g_values, triples[:, 1])
+    b_ranks = np.searchsorted(b_values, triples[:, 2])
+    positions = np.arange(len(triples))
+    levels = []
+    # Schlüssel "Block * (Anzahl Ränge + 1) + Rang" sind pro Ebene monoton und passen meist in int32
+    key_type = np.int32 if len(triples) * (max(len(g_values), len(b_values)) + 1) < 2 ** 31 else np.int64
+    for level in range(max(len(triples).bit_length(), 1)):
+        g_keys = ((positions >> level) * (len(g_values) + 1) + g_ranks).astype(key_type)
+        order = np.argsort(g_keys, kind='stable')
+        g_keys = g_keys[order]
+        inner_levels = []
+        for inner_level in range(level + 1):
+            b_keys = ((positions >> inner_level) * (len(b_values) + 1) + b_ranks[order]).astype(key_type)
+            inner_order = np.argsort(b_keys, kind='stable')
+            b_keys = b_keys[inner_order]
+            prefix_sums = np.concatenate(([0], np.cumsum(weights[order[inner_order]])))
+            inner_levels.append((b_keys, prefix_sums))
+        levels.append((g_keys, inner_levels))
+    return triples[:, 0], g_values, b_values, levels
+
+
+def possible_id_sums(index, limits):
+    # Beliebig viele (r, g, b)-Limits auf einmal, vektorisiert über alle Anfragen. Pro Anfrage O(log³ U):
+    # das r-Präfix zerfällt in höchstens log U Blöcke, deren g-Präfix wiederum in höchstens log U Blöcke
+    r_values, g_values, b_values, levels = index
+    limits = np.asarray(limits, dtype=np.int64).reshape(-1, 3)
+    prefix = np.searchsorted(r_values, limits[:, 0], side='right')
+    g_counts = np.searchsorted(g_values, limits[:, 1], side='right')
+    b_counts = np.searchsorted(b_values, limits[:, 2], side='right')
+    sums = np.zeros(len(limits), dtype=np.int64)
+    for level, (g_keys, inner_levels) in enumerate(levels):
+        queries = np.flatnonzero((prefix >> level) & 1)
+        if not len(queries):
+            continue
+        # Voller Block [start, start + 2^L) des r-Präfix, darin alle Spiele mit g <= Limit
+        block = prefix[queries] >> (level + 1) << 1
+        start = block << level
+        stop = np.searchsorted(g_keys, block * (len(g_values) + 1) + g_counts[queries])
+        count = stop - start
+        for inner_level, (b_keys, prefix_sums) in enumerate(inner_levels):
+            selected = np.flatnonzero((count >> inner_level) & 1)
+            if not len(selected):
+                continue
+            inner_block = (start[selected] + (count[selected] >> (inner_level + 1) << (inner_level + 1))) >> inner_level
+            inner_stop = np.searchsorted(b_keys, inner_block * (len(b_values) + 1) + b_counts[queries[selected]])
+            sums[queries[selected]] += prefix_sums[inner_stop] - prefix_sums[inner_block << inner_level]
+    return sums
+
+
+count_pattern = re.compile(r'(\d+) ([rgb])')
+
+
+def stream_game_maxima(path='inputs/input_day2'):
+    # Ein Spiel pro Zeile, es wird immer nur die aktuelle Zeile gehalten
+    with open(path, 'r') as file:
+        for game_id, line in enumerate(file, start=1):
+            maxima = {'r': 0, 'g': 0, 'b': 0}
+            for count, color in count_pattern.findall(line, line.find(':')):
+                if int(count) > maxima[color]:
+                    maxima[color] = int(count)
+            yield game_id, maxima['r'], maxima['g'], maxima['b']
+
+
+def solve(path='inputs/input_day2'):
+    # Beide Teile in einem Durchgang über die Datei
+    sum_possible_ids = 0
+    sum_powers = 0
+    for game_id, r, g, b in stream_game_maxima(path):
+        if r <= 12 and g <= 13 and b <= 14:
+            sum_possible_ids += game_id
+        sum_powers += r * g * b
+    return sum_possible_ids, sum_powers
 
 
 def part1():
     # only 12 red cubes, 13 green cubes, and 14 blue cubes
-    games = convert_input()
-    sum_possible_ids = 0
-    for i, game in enumerate(games):
-        s = i + 1
-        for turn in game:
-            if turn[0] > 12 or turn[1] > 13 or turn[2] > 14:
-                s = 0
-        sum_possible_ids += s
-    return sum_possible_ids
+    maxima = maxima_per_game(*convert_input())
+    possible = (maxima <= (12, 13, 14)).all(axis=1)
+    return int((np.flatnonzero(possible) + 1).sum())
 
 
 def part2():
-    games = convert_input()
-    sum_powers = 0
-    i = 1
-    for game in games:
-        r, g, b = 0, 0, 0
-        for turn in game:
-            if turn[0] > r:
-                r = turn[0]
-            if turn[1] > g:
-                g = turn[1]
-            if turn[2] > b:
-                b = turn[2]
-        print(i, r, g, b)
-        i += 1
-        sum_powers += (r * g * b)
-    return sum_powers
+    maxima = maxima_per_game(*convert_input()).astype(np.int64)
+    return int(maxima.prod(axis=1).sum())
 
 
 if __name__ == "__main__":
@@ -79,70 +79,183 @@ What is the sum of all of the gear ratios in your engine schematic?
 
 """
 
-# import numpy as np
-# import re
-
-
-def part1():
-    sum_part_numbers = 0
-    with open('inputs/input_day3', 'r') as file:
-        numbers = []
-        symbols = set()
-        for y, line in enumerate(file):
-            number = ''
-            for x, char in enumerate(line):
-                if char.isnumeric():
-                    number += char
-                elif number != '':
-                    numbers.append([x-len(number), y, number])
-                    number = ''
-                if not (char.isnumeric() or char == "." or char == "\n"):
-                    symbols.add((x, y))
-
-        for number in numbers:
-            for x in range(number[0] - 1, number[0] + len(number[2]) + 1):
-                if (x, number[1] - 1) in symbols or (x, number[1]) in symbols or (x, number[1] + 1) in symbols:
-                    sum_part_numbers += int(number[2])
-                    break
-
-    return sum_part_numbers
-
-
-def part2():
-    with open('inputs/input_day3', 'r') as file:
-        numbers = []
-        gears = dict()
-        for y, line in enumerate(file):
-            number = ''
-            for x, char in enumerate(line):
-                if char.isnumeric():
-                    number += char
-                elif number != '':
-                    numbers.append([x-len(number), y, number])
-                    number = ''
-                if char == "*":
-                    gears[(x, y)] = [0, 1]
-
-    sum_gear_ratios = 0
-    for number in numbers:
-        for x in range(number[0] - 1, number[0] + len(number[2]) + 1):
-            y = number[1]
-            if (x, y - 1) in gears:
-                gears[(x, y - 1)][0] += 1
-                gears[(x, y - 1)][1] *= int(number[2])
-                break
-            elif (x, y) in gears:
-                gears[(x, y)][0] += 1
-                gears[(x, y)][1] *= int(number[2])
-                break
-            elif (x, y + 1) in gears:
-                gears[(x, y + 1)][0] += 1
-                gears[(x, y + 1)][1] *= int(number[2])
-                break
-    for gear in gears.values():
-        if gear[0] == 2:
-            sum_gear_ratios += gear[1]
-    return sum_gear_ratios
+import numpy as np
+import re
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+def read_grid(path='inputs/input_day3'):
+    with open(path, 'rb') as file:
+        lines = file.read().split()
+    return np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(len(lines), -1)
+
+
+def label_numbers(grid):
+    # Rechts eine Spalte '.' anhängen, damit keine Zahl über das Zeilenende hinaus weiterläuft
+    padded = np.pad(grid, ((0, 0), (0, 1)), constant_values=ord('.')).ravel()
+    digit_positions = np.flatnonzero((padded >= 48) & (padded <= 57))
+    run_starts = np.flatnonzero(np.diff(digit_positions, prepend=-2) != 1)
+    run_lengths = np.diff(run_starts, append=len(digit_positions))
+    run_ends = digit_positions[run_starts + run_lengths - 1]
+    powers = 10 ** (np.repeat(run_ends, run_lengths) - digit_positions)
+    values = np.add.reduceat((padded[digit_positions] - 48).astype(np.int64) * powers, run_starts)
+
+    # Jede Zelle einer Zahl bekommt die Nummer (ab 1) ihrer Zahl, alle anderen Zellen 0
+    labels = np.zeros(padded.size, dtype=np.int32)
+    labels[digit_positions] = np.repeat(np.arange(1, len(run_starts) + 1, dtype=np.int32), run_lengths)
+    return labels.reshape(grid.shape[0], -1)[:, :-1], values
+
+
+def dilate(mask):
+    # 3x3-Nachbarschaft: Zelle ist gesetzt, wenn sie selbst oder ein Nachbar gesetzt ist
+    height, width = mask.shape
+    padded = np.pad(mask, 1)
+    dilated = np.zeros_like(mask)
+    for dy in range(3):
+        for dx in range(3):
+            dilated |= padded[dy:dy + height, dx:dx + width]
+    return dilated
+
+
+number_pattern = re.compile(r'\d+')
+
+
+class Schematic:
+    # Ein einziger Parse für beide Teile: Zahlen als kompakte Arrays (x, y, length, value),
+    # Symbole je Zeichen als Array der Zellpositionen y * width + x, dazu das Label-Gitter Zelle -> Zahl
+    def __init__(self, grid):
+        self.grid = grid
+        self.height, self.width = grid.shape
+        self.labels, self.value = label_numbers(grid)
+        number_y, number_x = np.nonzero(self.labels)
+        _, first_cells, self.length = np.unique(self.labels[number_y, number_x], return_index=True,
+                                                return_counts=True)
+        self.x, self.y = number_x[first_cells], number_y[first_cells]
+
+        self.symbol_mask = (self.labels == 0) & (grid != ord('.'))
+        positions = np.flatnonzero(self.symbol_mask)
+        chars = grid.ravel()[positions]
+        self.symbols = {chr(char): positions[chars == char] for char in np.unique(chars).tolist()}
+
+    @classmethod
+    def from_file(cls, path='inputs/input_day3'):
+        return cls(read_grid(path))
+
+    def part_numbers_sum(self):
+        # Teilenummern sind alle Zahlen, die die erweiterte Symbolmaske berühren
+        is_part = np.zeros(len(self.value) + 1, dtype=bool)
+        is_part[self.labels[dilate(self.symbol_mask)]] = True
+        return int(self.value[is_part[1:]].sum())
+
+    def gear_ratios_sum(self):
+        label_values = np.concatenate(([0], self.value))
+
+        # Für jedes '*' die Zahlennummern der 8 Nachbarn einmal nachschlagen
+        gears_y, gears_x = np.divmod(self.symbols.get('*', np.zeros(0, dtype=np.int64)), self.width)
+        padded = np.pad(self.labels, 1)
+        neighbours = np.sort(np.stack([padded[gears_y + dy, gears_x + dx] for dy in range(3) for dx in range(3)],
+                                      axis=1), axis=1)
+
+        # Doppelte Nummern (eine Zahl grenzt mit mehreren Ziffern an) nur einmal zählen
+        distinct = (neighbours != 0) & (neighbours != np.pad(neighbours, ((0, 0), (1, 0)))[:, :-1])
+        is_gear = distinct.sum(axis=1) == 2
+        gear_ratios = np.where(distinct, label_values[neighbours], 1).prod(axis=1)
+        return int(gear_ratios[is_gear].sum())
+
+
+def part1(path='inputs/input_day3'):
+    return Schematic.from_file(path).part_numbers_sum()
+
+
+def part2(path='inputs/input_day3'):
+    return Schematic.from_file(path).gear_ratios_sum()
+
+
+def solve(path='inputs/input_day3'):
+    # Beide Teile aus demselben Parse
+    schematic = Schematic.from_file(path)
+    return schematic.part_numbers_sum(), schematic.gear_ratios_sum()
+
+
+empty_row = ([], set(), [])
+
+
+def parse_row(line):
+    line = line.rstrip('\n')
+    numbers = [(match.start(), match.end(), int(match.group())) for match in number_pattern.finditer(line)]
+    symbols = {x for x, char in enumerate(line) if not (char.isdigit() or char == '.')}
+    gears = [x for x in symbols if line[x] == '*']
+    return numbers, symbols, gears
+
+
+def evaluate_row(above, middle, below):
+    window = (above, middle, below)
+    part_numbers = [value for start, end, value in middle[0]
+                    if any(x in row[1] for row in window for x in range(start - 1, end + 1))]
+    gear_ratios = []
+    for gear in middle[2]:
+        adjacent = [value for row in window for start, end, value in row[0] if start - 1 <= gear <= end]
+        if len(adjacent) == 2:
+            gear_ratios.append(adjacent[0] * adjacent[1])
+    return part_numbers, gear_ratios
+
+
+def scan_rows(lines):
+    # Nur vorherige, aktuelle und nächste Zeile im Speicher, jede Zeile wird ausgewertet, sobald die nächste da ist
+    above, middle = empty_row, None
+    for line in lines:
+        below = parse_row(line)
+        if middle is not None:
+            yield evaluate_row(above, middle, below)
+            above = middle
+        middle = below
+    if middle is not None:
+        yield evaluate_row(above, middle, empty_row)
+
+
+def solve_streaming(path='inputs/input_day3'):
+    sum_part_numbers, sum_gear_ratios = 0, 0
+    with open(path, 'r') as file:
+        for part_numbers, gear_ratios in scan_rows(file):
+            sum_part_numbers += sum(part_numbers)
+            sum_gear_ratios += sum(gear_ratios)
+    return sum_part_numbers, sum_gear_ratios
+
+
+def solve_band(lines, owned_start, owned_stop):
+    # Halo-Zeilen liefern nur Nachbarschaft, gezählt werden ausschließlich die eigenen Zeilen des Bands
+    sum_part_numbers, sum_gear_ratios = 0, 0
+    for row, (part_numbers, gear_ratios) in enumerate(scan_rows(lines)):
+        if row >= owned_stop:
+            break
+        if row >= owned_start:
+            sum_part_numbers += sum(part_numbers)
+            sum_gear_ratios += sum(gear_ratios)
+    return sum_part_numbers, sum_gear_ratios
+
+
+def solve_parallel(path='inputs/input_day3', workers=None):
+    workers = workers or os.cpu_count()
+    with open(path, 'r') as file:
+        lines = file.read().splitlines()
+
+    # Horizontale Bänder mit je einer Halo-Zeile oben und unten, jede Zeile gehört genau einem Band
+    band_height = max(1, -(-len(lines) // (4 * workers)))
+    bands, owned_starts, owned_stops = [], [], []
+    for start in range(0, len(lines), band_height):
+        stop = min(start + band_height, len(lines))
+        halo_start = max(start - 1, 0)
+        bands.append(lines[halo_start:stop + 1])
+        owned_starts.append(start - halo_start)
+        owned_stops.append(stop - halo_start)
+
+    sum_part_numbers, sum_gear_ratios = 0, 0
+    with ProcessPoolExecutor(workers) as executor:
+        for part_numbers, gear_ratios in executor.map(solve_band, bands, owned_starts, owned_stops):
+            sum_part_numbers += part_numbers
+            sum_gear_ratios += gear_ratios
+    return sum_part_numbers, sum_gear_ratios
 
 
 if __name__ == "__main__":
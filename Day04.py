@@ -93,38 +93,125 @@ Process all of the original and copied scratchcards until no more scratchcards a
 scratchcards, how many total scratchcards do you end up with?
 """
 
-# import numpy as np
+import numpy as np
 # import re
+from array import array
+import functools
+import os
+
+
+def to_bitset(numbers):
+    bitset = 0
+    for number in numbers.split():
+        bitset |= 1 << int(number)
+    return bitset
+
+
+def card_hits(line):
+    # Gewinnzahlen und eigene Zahlen als Bitmengen, Treffer sind die gesetzten Bits der Schnittmenge
+    winning_numbers, owned_numbers = line.split(':')[1].split('|')
+    return (to_bitset(winning_numbers) & to_bitset(owned_numbers)).bit_count()
+
+
+def fixed_width_numbers(grid, columns):
+    # Zweistellige Zahlen ab den gegebenen Spalten, führendes Leerzeichen zählt als 0
+    tens = grid[:, columns].astype(np.int64)
+    ones = grid[:, columns + 1].astype(np.int64)
+    return np.where(tens == 32, 0, tens - 48) * 10 + ones - 48
+
+
+def packed_bitsets(values, words):
+    # Eine Zeile gepackter uint64-Wörter pro Karte
+    matrix = np.zeros((len(values), words), dtype=np.uint64)
+    rows = np.repeat(np.arange(len(values)), values.shape[1])
+    values = values.ravel()
+    np.bitwise_or.at(matrix, (rows, values >> 6), np.left_shift(1, values & 63).astype(np.uint64))
+    return matrix
+
+
+def hit_counts_bulk(path='inputs/input_day4'):
+    # Alle Karten auf einmal, setzt das feste Spaltenformat der Eingabe voraus (Zahlen rechtsbündig, 3 Zeichen breit)
+    with open(path, 'rb') as file:
+        lines = file.read().splitlines()
+    grid = np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(len(lines), -1)
+    colon, bar = lines[0].index(b':'), lines[0].index(b'|')
+    winning_numbers = fixed_width_numbers(grid, np.arange(colon + 2, bar - 1, 3))
+    owned_numbers = fixed_width_numbers(grid, np.arange(bar + 2, grid.shape[1], 3))
+
+    words = int(max(winning_numbers.max(), owned_numbers.max())) // 64 + 1
+    common = packed_bitsets(winning_numbers, words) & packed_bitsets(owned_numbers, words)
+    return np.unpackbits(common.view(np.uint8), axis=1).sum(axis=1)
+
+
+@functools.lru_cache(maxsize=1)
+def cached_hit_counts(path, modification_time):
+    # Nur der letzte Dateistand wird gehalten, schreibgeschützt, damit kein Aufrufer den Cache verändert
+    with open(path, 'r') as file:
+        return memoryview(array('H', (card_hits(line) for line in file))).toreadonly()
+
+
+def hit_counts(path='inputs/input_day4'):
+    # Treffer pro Karte werden nur einmal pro Dateistand berechnet
+    return cached_hit_counts(path, os.stat(path).st_mtime_ns)
+
+
+def points(hits):
+    return sum(1 << (matches - 1) for matches in hits if matches > 0)
+
+
+def count_cards(hits):
+    # Differenzen-Array: diff[i] ist die Änderung der geerbten Kopien von Karte i - 1 zu Karte i
+    total_cards = 0
+    inherited_copies = 0
+    diff = [0] * (len(hits) + 1)
+    for card_nr, matches in enumerate(hits):
+        inherited_copies += diff[card_nr]
+        copies = inherited_copies + 1
+        total_cards += copies
+        # Die nächsten hits Karten erhalten je copies Kopien: O(1) statt einer inneren Schleife
+        diff[card_nr + 1] += copies
+        diff[min(card_nr + matches + 1, len(hits))] -= copies
+    return total_cards
 
 
 def part1():
-    sum_points = 0
-    with open('inputs/input_day4', 'r') as file:
-        for line in file:
-            line = line[10:-1].strip()
-            winning_numbers, owned_numbers = line.split(' | ')
-            winning_numbers = {int(i) for i in winning_numbers.replace("  ", " ").split(" ")}
-            owned_numbers = {int(i) for i in owned_numbers.strip().replace("  ", " ").split(" ")}
-            hits = len(owned_numbers.intersection(winning_numbers))
-            sum_points += 2 ** (hits - 1) if hits > 0 else 0
-    return sum_points
+    return points(hit_counts())
 
 
 def part2():
-    number_of_cards = {i:0 for i in range(1, 206)}
-    card_nr = 1
-    with open('inputs/input_day4', 'r') as file:
-        for line in file:
-            number_of_cards[card_nr] += 1
-            line = line[10:-1].strip()
-            winning_numbers, owned_numbers = line.split(' | ')
-            winning_numbers = {int(i) for i in winning_numbers.replace("  ", " ").split(" ")}
-            owned_numbers = {int(i) for i in owned_numbers.strip().replace("  ", " ").split(" ")}
-            hits = len(owned_numbers.intersection(winning_numbers))
-            for i in range(1, hits + 1):
-                number_of_cards[card_nr + i] += number_of_cards[card_nr]
-            card_nr += 1
-    return sum(number_of_cards.values())
+    return count_cards(hit_counts())
+
+
+def stream_card_totals(lines, max_hits=None):
+    # Karte i wirkt höchstens auf die nächsten max_hits Karten, daher reicht ein Ringpuffer der Differenzen
+    ring = None
+    total_cards = 0
+    inherited_copies = 0
+    for card_nr, line in enumerate(lines):
+        if ring is None:
+            if max_hits is None:
+                max_hits = len(line.split(':')[1].split('|')[0].split())
+            ring = [0] * (max_hits + 1)
+        hits = card_hits(line)
+        if hits > max_hits:
+            raise ValueError(f"card {card_nr + 1} has {hits} hits, more than max_hits={max_hits}")
+
+        slot = card_nr % len(ring)
+        inherited_copies += ring[slot]
+        ring[slot] = 0
+        copies = inherited_copies + 1
+        total_cards += copies
+        ring[(card_nr + 1) % len(ring)] += copies
+        ring[(card_nr + hits + 1) % len(ring)] -= copies
+        yield total_cards
+
+
+def part2_streaming(path='inputs/input_day4'):
+    total_cards = 0
+    with open(path, 'r') as file:
+        for total_cards in stream_card_totals(file):
+            pass
+    return total_cards
 
 
 if __name__ == "__main__":
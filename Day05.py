@@ -150,78 +150,219 @@ location number that corresponds to any of the initial seed numbers?
 
 """
 
-# import numpy as np
+import numpy as np
 # import re
-from collections import OrderedDict
-
-
-def read_input():
-    maps = OrderedDict()
-    with open('inputs/input_day5', 'r') as file:
-        seeds = list(map(int, file.readline()[7:].split()))
-        for i in range(1, 192):
-            line = file.readline()
-            if line == "\n":
-                pass
-            elif "map:" in line:
-                current_map = line[:-6]
-                maps[current_map] = list()
+from bisect import bisect_left, bisect_right
+import functools
+
+
+def read_input(path='inputs/input_day5'):
+    # Abschnitte beliebiger Länge und Anzahl, die Stufen werden in Dateireihenfolge kompiliert
+    seeds = []
+    stages = []
+    mapping = None
+    with open(path, 'r') as file:
+        for line in file:
+            if line.startswith('seeds:'):
+                seeds = list(map(int, line[6:].split()))
+            elif line.rstrip().endswith('map:'):
+                if mapping is not None:
+                    stages.append(compile_map(mapping))
+                mapping = []
+            elif line.strip():
+                mapping.append(tuple(map(int, line.split())))
+    if mapping is not None:
+        stages.append(compile_map(mapping))
+    return seeds, tuple(stages)
+
+
+def compile_map(mapping):
+    # Stückweise lineare Funktion: Abschnitt i beginnt bei starts[i] und verschiebt um offsets[i],
+    # Lücken zwischen den Mapping-Zeilen werden mit Identitätsabschnitten (offset 0) gefüllt
+    starts, offsets = [0], [0]
+    for destination, source, length in sorted(mapping, key=lambda m: m[1]):
+        if source == starts[-1]:
+            offsets[-1] = destination - source
+        else:
+            starts.append(source)
+            offsets.append(destination - source)
+        starts.append(source + length)
+        offsets.append(0)
+    return tuple(starts), tuple(offsets)
+
+
+def apply_map(compiled_map, value):
+    starts, offsets = compiled_map
+    return value + offsets[bisect_right(starts, value) - 1]
+
+
+def compose_maps(first, second):
+    # Ergebnis bildet x auf second(first(x)) ab: jeder Abschnitt von first wird an den Grenzen von second,
+    # zurückgerechnet in den Definitionsbereich von first, weiter unterteilt
+    first_starts, first_offsets = first
+    second_starts, second_offsets = second
+    starts, offsets = [], []
+    for i, (start, offset) in enumerate(zip(first_starts, first_offsets)):
+        end = first_starts[i + 1] if i + 1 < len(first_starts) else None
+        j = bisect_right(second_starts, start + offset) - 1
+        position = start
+        while True:
+            # Benachbarte Abschnitte mit gleicher Verschiebung zusammenfassen
+            if not offsets or offsets[-1] != offset + second_offsets[j]:
+                starts.append(position)
+                offsets.append(offset + second_offsets[j])
+            if j + 1 == len(second_starts):
+                break
+            position = second_starts[j + 1] - offset
+            if end is not None and position >= end:
+                break
+            j += 1
+    return tuple(starts), tuple(offsets)
+
+
+@functools.lru_cache(maxsize=None)
+def compose_chain(stages):
+    # Die ganze Kette seed -> location als eine einzige stückweise lineare Funktion
+    return functools.reduce(compose_maps, stages)
+
+
+def locations_bulk(seeds, stages):
+    # Alle Seeds auf einmal durch jede Stufe: Abschnitt per searchsorted, dann Verschiebung addieren
+    locations = np.asarray(seeds, dtype=np.int64)
+    for starts, offsets in stages:
+        segments = np.searchsorted(np.asarray(starts, dtype=np.int64), locations, side='right') - 1
+        locations = locations + np.asarray(offsets, dtype=np.int64)[segments]
+    return locations
+
+
+class IntervalSet:
+    # Sortierte, disjunkte halboffene Intervalle [start, end), überlappende und angrenzende werden verschmolzen
+    def __init__(self, intervals=()):
+        self.starts, self.ends = [], []
+        for start, end in sorted(intervals):
+            if start >= end:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
             else:
-                maps[current_map].append(list(map(int, line.split())))
-    return seeds, maps
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def add(self, start, end):
+        if start >= end:
+            return
+        i = bisect_left(self.ends, start)
+        j = bisect_right(self.starts, end)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def minimum(self):
+        return self.starts[0]
+
+
+def map_intervals(compiled_map, intervals):
+    # Jedes Intervall an den Abschnittsgrenzen zerlegen und verschieben, das Ergebnis wird wieder verschmolzen
+    starts, offsets = compiled_map
+    pieces = []
+    for start, end in intervals:
+        i = bisect_right(starts, start) - 1
+        while start < end:
+            piece_end = min(end, starts[i + 1]) if i + 1 < len(starts) else end
+            pieces.append((start + offsets[i], piece_end + offsets[i]))
+            start = piece_end
+            i += 1
+    return IntervalSet(pieces)
+
+
+def propagate(intervals, stages):
+    for stage in stages:
+        intervals = map_intervals(stage, intervals)
+    return intervals
+
+
+class AlmanacIndex:
+    # Einmal aus einer (komponierten) Map gebaut, danach kostet jede Anfrage O(log Abschnitte)
+    def __init__(self, compiled_map):
+        starts, offsets = compiled_map
+
+        # Innerhalb eines Abschnitts steigt die Funktion, das Minimum eines Abschnitts liegt also an seinem Anfang.
+        # Sparse Table: table[k][i] ist das Minimum der Abschnittsanfänge i .. i + 2^k - 1
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.table = [self.starts + self.offsets]
+        while 2 ** len(self.table) <= len(starts):
+            half = 2 ** (len(self.table) - 1)
+            self.table.append(np.minimum(self.table[-1][:-half], self.table[-1][half:]))
+
+        # Umkehrung location -> seed: der Bildbereich wird an allen Bildgrenzen zerlegt, zu jedem
+        # Elementarabschnitt gehören die Verschiebungen aller Abschnitte, deren Bild ihn überdeckt
+        # (die Abbildung muss nicht injektiv sein)
+        images = [(start + offset, end + offset if end is not None else None, offset)
+                  for start, end, offset in zip(starts, starts[1:] + (None,), offsets)]
+        self.breakpoints = sorted({image_start for image_start, _, _ in images}
+                                  | {image_end for _, image_end, _ in images if image_end is not None})
+        self.covering = [[] for _ in self.breakpoints]
+        for image_start, image_end, offset in images:
+            last = bisect_left(self.breakpoints, image_end) if image_end is not None else len(self.breakpoints)
+            for k in range(bisect_left(self.breakpoints, image_start), last):
+                self.covering[k].append(offset)
+
+    def min_locations(self, ranges):
+        # Minimum für beliebig viele halboffene Bereiche [start, end) auf einmal,
+        # je Bereich zwei Binärsuchen und ein Tabellenzugriff. Leere Bereiche (end <= start) haben kein
+        # Minimum und werden abgelehnt
+        ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        empty = np.flatnonzero(ranges[:, 1] <= ranges[:, 0])
+        if len(empty):
+            raise ValueError(f"empty seed range {tuple(ranges[empty[0]].tolist())} at index {empty[0]}")
+        first, last = ranges[:, 0], ranges[:, 1] - 1
+        i = np.searchsorted(self.starts, first, side='right') - 1
+        j = np.searchsorted(self.starts, last, side='right') - 1
+        minima = first + self.offsets[i]
+
+        # Abschnitte i + 1 .. j beginnen innerhalb des Bereichs und tragen ihren Anfangswert bei
+        inner = j > i
+        levels = np.zeros_like(i)
+        levels[inner] = np.log2(j[inner] - i[inner]).astype(np.int64)
+        for level in np.unique(levels[inner]):
+            mask = inner & (levels == level)
+            left = self.table[level][i[mask] + 1]
+            right = self.table[level][j[mask] - 2 ** level + 1]
+            minima[mask] = np.minimum(minima[mask], np.minimum(left, right))
+        return minima
+
+    def preimage(self, start, end):
+        # Alle Seeds, deren Location in [start, end) liegt
+        pieces = []
+        k = max(bisect_right(self.breakpoints, start) - 1, 0)
+        while k < len(self.breakpoints) and self.breakpoints[k] < end:
+            low = max(start, self.breakpoints[k])
+            high = min(end, self.breakpoints[k + 1]) if k + 1 < len(self.breakpoints) else end
+            for offset in self.covering[k]:
+                pieces.append((low - offset, high - offset))
+            k += 1
+        return IntervalSet(pieces)
 
 
 def part1():
-    seeds, maps = read_input()
-    locations = list()
-    for seed in seeds:
-        for m in maps.values():
-            for mapping in m:
-                if mapping[1] <= seed <= (mapping[1] + mapping[2]):
-                    seed = mapping[0] + (seed - mapping[1])
-                    break
-        locations.append(seed)
-    return min(locations)
+    seeds, stages = read_input()
+    chain = compose_chain(stages)
+    return min(apply_map(chain, seed) for seed in seeds)
 
 
 def part2():
-    seeds, maps = read_input()
-    seed_intervalls = list()
-
-    for i in range(0, len(seeds), 2):
-        seed_intervalls.append([seeds[i], seeds[i] + seeds[i+1] - 1])
-
-    for m in maps.values():
-        new_seed_intervalls = list()
-        for intervall in seed_intervalls:
-            for mapping in m:
-                # Für bessere Lesbarkeit
-                mapping_lower_bound = mapping[1]
-                mapping_upper_bound = mapping[1] + mapping[2] - 1
-                # Schneidet sich das Seed-Intervall mit dem Mapping-Intervall?
-                if intervall[0] <= mapping_upper_bound and intervall[1] >= mapping_lower_bound:
-                    # Bestimme untere Mapping-Intervallgrenze
-                    if intervall[0] < mapping_lower_bound:
-                        lower_bound = mapping[0]
-                        seed_intervalls.append([intervall[0], mapping_lower_bound - 1])
-                    else:
-                        lower_bound = mapping[0] + (intervall[0] - mapping_lower_bound)
-                    # Bestimme obere Mapping-Intervallgrenze
-                    if mapping_upper_bound < intervall[1]:
-                        upper_bound = mapping[0] + mapping[2] - 1
-                        seed_intervalls.append([mapping_upper_bound + 1, intervall[1]])
-                    else:
-                        upper_bound = mapping[0] + (intervall[1] - mapping[1])
-                    # Füge neues Intervall hinzu
-                    new_seed_intervalls.append([lower_bound, upper_bound])
-                    break
-            # For-Loop läuft durch ohne break
-            else:
-                new_seed_intervalls.append(intervall)
-
-        # Bereite nächste Mapping-Ebene vor
-        seed_intervalls = new_seed_intervalls
-    return min([intervall[0] for intervall in seed_intervalls])
+    seeds, stages = read_input()
+    seed_intervals = IntervalSet((seeds[i], seeds[i] + seeds[i + 1]) for i in range(0, len(seeds), 2))
+    return map_intervals(compose_chain(stages), seed_intervals).minimum()
 
 
 if __name__ == "__main__":
@@ -91,9 +91,38 @@ How many ways can you beat the record in this one much longer race?
 
 """
 
-import numpy as np
+# import numpy as np
 # import re
 # from collections import OrderedDict
+import math
+import random
+
+
+def count_winning_times(time, distance):
+    # Gewonnen, wenn t * (time - t) > distance, also für t echt zwischen den Nullstellen von
+    # t^2 - time * t + distance. Exakt mit Ganzzahlwurzel statt Gleitkomma.
+    discriminant = time * time - 4 * distance
+    if discriminant < 0:
+        return 0
+    # Haltezeit liegt in [0, time], bei negativem Rekord kann die kleinere Nullstelle darunter liegen
+    t = max((time - math.isqrt(discriminant)) // 2, 0)
+    # Schätzung liegt höchstens eins neben der kleinsten gewinnenden Zeit
+    while t * (time - t) <= distance and t <= time // 2:
+        t += 1
+    while t > 0 and (t - 1) * (time - t + 1) > distance:
+        t -= 1
+    if t * (time - t) <= distance:
+        return 0
+    # Symmetrisch: gewonnen für t .. time - t
+    return time - 2 * t + 1
+
+
+def verify_solver(cases=1000, max_time=500):
+    for _ in range(cases):
+        time = random.randint(0, max_time)
+        distance = random.randint(-time * time - 2, time * time // 4 + 1)
+        brute_force = sum(1 for t in range(time + 1) if t * (time - t) > distance)
+        assert count_winning_times(time, distance) == brute_force, (time, distance)
 
 
 def part1():
@@ -104,12 +133,7 @@ def part1():
 
     mult_number_of_ways = 1
     for time, distance in races:
-        won_races = 0
-        # t abgewartete Zeit
-        for t in range(time):
-            if t * (time - t) > distance:
-                won_races += 1
-        mult_number_of_ways *= won_races
+        mult_number_of_ways *= count_winning_times(time, distance)
     return mult_number_of_ways
 
 
@@ -117,8 +141,7 @@ def part2():
     with open('inputs/input_day6', 'r') as file:
         time = int(file.readline().replace(" ", "").split(":")[1])
         distance = int(file.readline().replace(" ", "").split(":")[1])
-    roots = np.roots([1, -time, distance])  # t^2 - t * time + distance = 0
-    return int(np.floor(roots[0]) - np.ceil(roots[1]) + 1)
+    return count_winning_times(time, distance)
 
 
 if __name__ == "__main__":